@@ -48,7 +48,7 @@ def create_app(config_name=None):
     # User loader for Flask-Login
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return db.session.get(User, int(user_id))
 
     # Register blueprints
     from app.auth import auth_bp
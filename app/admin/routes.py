@@ -71,7 +71,7 @@ def users():
 @admin_required
 def user_detail(user_id):
     """View user details."""
-    user = User.query.get_or_404(user_id)
+    user = db.get_or_404(User, user_id)
     bookings = user.bookings.order_by(Booking.day_of_week).all()
 
     # Get recent logs for this user's bookings
@@ -90,7 +90,7 @@ def user_detail(user_id):
 @admin_required
 def verify_user_email(user_id):
     """Manually verify a user's email."""
-    user = User.query.get_or_404(user_id)
+    user = db.get_or_404(User, user_id)
 
     if user.email_verified:
         flash(f'{user.email} is already verified', 'info')
@@ -108,7 +108,7 @@ def reset_user_password(user_id):
     """Send password reset email to user."""
     from app.email import send_password_reset_email
 
-    user = User.query.get_or_404(user_id)
+    user = db.get_or_404(User, user_id)
     send_password_reset_email(user)
     flash(f'Password reset email sent to {user.email}', 'success')
     return redirect(url_for('admin.user_detail', user_id=user_id))
@@ -118,7 +118,7 @@ def reset_user_password(user_id):
 @admin_required
 def toggle_admin(user_id):
     """Toggle admin status for user."""
-    user = User.query.get_or_404(user_id)
+    user = db.get_or_404(User, user_id)
 
     # Prevent removing own admin status
     if user.id == current_user.id:
@@ -137,7 +137,7 @@ def toggle_admin(user_id):
 @admin_required
 def delete_user(user_id):
     """Delete a user."""
-    user = User.query.get_or_404(user_id)
+    user = db.get_or_404(User, user_id)
 
     # Prevent self-deletion
     if user.id == current_user.id:
@@ -344,7 +344,7 @@ class Booking(db.Model):
         db.UniqueConstraint('user_id', 'day_of_week', 'time', 'class_type', name='unique_user_booking'),
     )
 
-    DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
 
     @property
     def day_name(self):
@@ -416,7 +416,7 @@ def _process_user_bookings(app, user_id, booking_data_list):
     results = []
 
     with app.app_context():
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user:
             logger.error(f'User {user_id} not found')
             return results
@@ -474,7 +474,7 @@ def _process_user_bookings(app, user_id, booking_data_list):
 
         # Process each booking for this user
         for booking_data in booking_data_list:
-            booking = Booking.query.get(booking_data['id'])
+            booking = db.session.get(Booking, booking_data['id'])
             if not booking:
                 continue
 
@@ -487,7 +487,22 @@ def _process_user_bookings(app, user_id, booking_data_list):
     return results
 
 
-def _process_single_booking_with_client(booking, client, app, user):
+def next_weekday(today, day_of_week):
+    """
+    Get the next date falling on a given weekday, strictly after today.
+
+    Args:
+        today: Reference date or datetime
+        day_of_week: Target weekday (0=Monday, 6=Sunday)
+
+    Returns:
+        Same type as today, 1 to 7 days later
+    """
+    days_ahead = (day_of_week - today.weekday()) % 7
+    return today + timedelta(days=days_ahead or 7)
+
+
+def _process_single_booking_with_client(booking, client, app, user, sleep=time.sleep):
     """
     Process a single booking using an existing client session.
 
@@ -496,6 +511,7 @@ def _process_single_booking_with_client(booking, client, app, user):
         client: Pre-authenticated WodBusterClient
         app: Flask application instance
         user: User model instance
+        sleep: Function used to wait RETRY_DELAY seconds between attempts
 
     Returns:
         dict: Result with status, booking info, and message
@@ -512,11 +528,7 @@ def _process_single_booking_with_client(booking, client, app, user):
     last_error = None
 
     # Calculate target date
-    today = datetime.now()
-    days_ahead = booking.day_of_week - today.weekday()
-    if days_ahead <= 0:
-        days_ahead += 7
-    target_date = today + timedelta(days=days_ahead)
+    target_date = next_weekday(datetime.now(), booking.day_of_week)
 
     # Retry loop
     for attempt in range(1, MAX_RETRY_ATTEMPTS + 1):
@@ -561,7 +573,7 @@ def _process_single_booking_with_client(booking, client, app, user):
             logger.warning(f'[Thread-{user.id}] Attempt {attempt} failed: {e}')
 
             if attempt < MAX_RETRY_ATTEMPTS:
-                time.sleep(RETRY_DELAY)
+                sleep(RETRY_DELAY)
             else:
                 booking.status = 'failed'
                 booking.fail_count += 1
@@ -573,7 +585,7 @@ def _process_single_booking_with_client(booking, client, app, user):
             logger.exception(f'[Thread-{user.id}] Unexpected error: {e}')
 
             if attempt < MAX_RETRY_ATTEMPTS:
-                time.sleep(RETRY_DELAY)
+                sleep(RETRY_DELAY)
             else:
                 booking.status = 'failed'
                 booking.fail_count += 1
@@ -606,11 +618,16 @@ def _process_single_booking_with_client(booking, client, app, user):
     }
 
 
-def _process_single_booking(booking, app):
+def _process_single_booking(booking, app, sleep=time.sleep):
     """
     Process a single booking with retry logic.
     Legacy function for backwards compatibility.
 
+    Args:
+        booking: Booking model instance
+        app: Flask application instance
+        sleep: Function used to wait RETRY_DELAY seconds between attempts
+
     Returns:
         dict: Result with status, booking info, and message for email notification
     """
@@ -627,11 +644,7 @@ def _process_single_booking(booking, app):
     last_error = None
 
     # Calculate target date
-    today = datetime.now()
-    days_ahead = booking.day_of_week - today.weekday()
-    if days_ahead <= 0:
-        days_ahead += 7
-    target_date = today + timedelta(days=days_ahead)
+    target_date = next_weekday(datetime.now(), booking.day_of_week)
 
     # Retry loop
     for attempt in range(1, MAX_RETRY_ATTEMPTS + 1):
@@ -709,7 +722,7 @@ def _process_single_booking(booking, app):
 
             if attempt < MAX_RETRY_ATTEMPTS:
                 logger.info(f'Retrying in {RETRY_DELAY} seconds...')
-                time.sleep(RETRY_DELAY)
+                sleep(RETRY_DELAY)
             else:
                 # Final attempt failed
                 booking.status = 'failed'
@@ -724,7 +737,7 @@ def _process_single_booking(booking, app):
 
             if attempt < MAX_RETRY_ATTEMPTS:
                 logger.info(f'Retrying in {RETRY_DELAY} seconds...')
-                time.sleep(RETRY_DELAY)
+                sleep(RETRY_DELAY)
             else:
                 booking.status = 'failed'
                 booking.fail_count += 1
@@ -838,7 +851,7 @@ def run_bookings_now(app, send_emails=True):
 
 def _send_booking_notifications(app, results_by_user):
     """Send email notifications to users about their booking results."""
-    from app.models import User
+    from app.models import db, User
     from app.email import send_booking_summary
 
     logger.info(f'Sending email notifications to {len(results_by_user)} users')
@@ -846,7 +859,7 @@ def _send_booking_notifications(app, results_by_user):
     with app.app_context():
         for user_id, results in results_by_user.items():
             try:
-                user = User.query.get(user_id)
+                user = db.session.get(User, user_id)
                 if user and user.email_notifications:
                     success = send_booking_summary(user, results)
                     if success:
@@ -1,4 +1,4 @@
-from app.scraper.client import WodBusterClient
+from app.scraper.client import WodBusterClient, Reservation
 from app.scraper.exceptions import (
     WodBusterError,
     LoginError,
@@ -12,6 +12,7 @@ from app.scraper.exceptions import (
 
 __all__ = [
     'WodBusterClient',
+    'Reservation',
     'WodBusterError',
     'LoginError',
     'SessionExpiredError',
@@ -4,10 +4,14 @@ import os
 import re
 import time
 import logging
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from html import unescape
 from typing import Optional, List, Dict, Any
 from urllib.parse import urljoin, urlparse
 
+import orjson
 import requests
 import cloudscraper
 from bs4 import BeautifulSoup
@@ -24,6 +28,58 @@ from app.scraper.exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Account info panel (body_CtlMenu_CtlInfoUser): its opening tag, capturing
+# the text right after it, which starts with the user name
+_INFO_PANEL_RE = re.compile(r'id="[^"]*CtlInfoUser[^"]*"[^>]*>([^<]*)', re.I)
+# Account info values. Tags between the label and its value (e.g.
+# "<b>Bono:</b> 5") are skipped, so the same patterns work on the page's HTML
+# and on the parsed panel text in _parse_account_info_soup.
+_BONO_RE = re.compile(r'Bono:\s*(?:<[^>]*>\s*)*(\d+)')
+_TARIFA_RE = re.compile(r'Tarifa:\s*(?:<[^>]*>\s*)*([^<\r\n]+)')
+
+# Login page messages, matched case-insensitively without lowercasing the page
+_LOGIN_ERROR_RE = re.compile(
+    'usuario o contraseña incorrectos|email o contraseña incorrectos|'
+    'credenciales incorrectas|invalid credentials|login failed',
+    re.I,
+)
+_DEVICE_CONFIRM_RE = re.compile('recordar este dispositivo|dispositivo de confianza|ctlseguro', re.I)
+
+# <input> tags carrying the ASP.NET form tokens, and their attributes. Quoted
+# attribute values may contain '>'.
+_INPUT_TAG_RE = re.compile(r'''<input\b((?:[^>"']|"[^"]*"|'[^']*')*)>''', re.I)
+_INPUT_ATTR_RE = re.compile(r'''([^\s"'=<>/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?''')
+# Scripts and comments, dropped before the scan so <input> markup inside them
+# (JS templates, commented-out fields) isn't taken for a real token
+_SCRIPT_OR_COMMENT_RE = re.compile(r'<script\b.*?</script\s*>|<!--.*?-->', re.I | re.S)
+
+
+def _parse_json(response) -> Any:
+    """Decode a JSON response body straight from its bytes.
+
+    orjson only accepts plain UTF-8; bodies it rejects (a UTF-8 BOM, UTF-16,
+    a declared legacy charset) go through requests' own decoding instead.
+    """
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        return response.json()
+
+
+@dataclass(slots=True)
+class Reservation:
+    """A class the user is booked into, as listed by get_my_reservations()."""
+
+    id: Optional[int]
+    name: str
+    time: str
+    date: str
+    date_str: str
+    day_name: str
+    status: str
+    booking_id: Optional[int]
+    can_cancel: bool
+
 
 class FlareSolverrClient:
     """Client for FlareSolverr proxy to bypass Cloudflare."""
@@ -59,7 +115,7 @@ class FlareSolverrClient:
                 timeout=65  # slightly more than maxTimeout
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = _parse_json(resp)
 
             if data.get('status') == 'ok':
                 solution = data.get('solution', {})
@@ -83,12 +139,19 @@ class FlareSolverrClient:
 class WodBusterClient:
     """Client for interacting with WodBuster."""
 
+    __slots__ = (
+        'box_url', 'box_name', '_login_url', 'timeout', 'session', '_logged_in',
+        '_class_index', 'flaresolverr_url', 'flaresolverr',
+    )
+
     BASE_URL = 'https://wodbuster.com'
     USER_AGENT = (
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
         'AppleWebKit/537.36 (KHTML, like Gecko) '
         'Chrome/119.0.0.0 Safari/537.36'
     )
+    POOL_MAXSIZE = 16  # Keep-alive connections kept per host
+    MAX_PARALLEL_DAYS = 7  # Concurrent LoadClass requests in get_classes_range()
 
     def __init__(self, box_url: str, timeout: int = 15, flaresolverr_url: str = None):
         """
@@ -101,9 +164,12 @@ class WodBusterClient:
         """
         self.box_url = box_url.rstrip('/')
         self.box_name = self._extract_box_name(box_url)
+        self._login_url = f'{self.BASE_URL}/account/login.aspx?cb={self.box_name}'
         self.timeout = timeout
         self.session = self._create_session()
         self._logged_in = False
+        # find_class() lookups: day -> HHMM start time -> (lowercased name, class)
+        self._class_index: Dict[Any, Dict[str, List[tuple]]] = {}
 
         # FlareSolverr for Cloudflare bypass
         self.flaresolverr_url = flaresolverr_url or os.environ.get('FLARESOLVERR_URL')
@@ -134,32 +200,45 @@ class WodBusterClient:
             'Upgrade-Insecure-Requests': '1',
         })
         # Don't set Accept-Encoding - let requests handle it automatically
+
+        # Keep connections to the box alive across the per-day request loops
+        # so each call doesn't pay a fresh TLS handshake. Resize the pools of
+        # the adapters cloudscraper already mounted instead of replacing them,
+        # as its https adapter carries the browser-like TLS configuration.
+        for prefix in ('https://', 'http://'):
+            adapter = scraper.get_adapter(prefix)
+            # HTTPAdapter has no public way to resize its pools. These private
+            # attributes are set on purpose: the adapter rebuilds its pool
+            # manager from them when unpickled, so they must match what
+            # init_poolmanager() is given. Only the per-host size grows; the
+            # number of pooled hosts keeps the adapter's own setting.
+            adapter._pool_maxsize = self.POOL_MAXSIZE
+            adapter.init_poolmanager(adapter._pool_connections, self.POOL_MAXSIZE, block=adapter._pool_block)
         return scraper
 
     def _get_login_url(self) -> str:
         """Get the centralized login URL with box callback."""
-        return f'{self.BASE_URL}/account/login.aspx?cb={self.box_name}'
+        return self._login_url
 
     def _extract_form_tokens(self, html: str) -> Dict[str, str]:
         """Extract ASP.NET form tokens from HTML."""
         tokens = {}
 
-        # Try lxml first, fallback to html.parser
-        try:
-            soup = BeautifulSoup(html, 'lxml')
-        except Exception:
-            soup = BeautifulSoup(html, 'html.parser')
-
-        # Get all hidden inputs
-        for inp in soup.find_all('input', attrs={'type': 'hidden'}):
-            name = inp.get('name')
-            if name:
-                tokens[name] = inp.get('value', '')
+        # Scan the <input> tags directly instead of building a document tree
+        if html:
+            for tag in _INPUT_TAG_RE.finditer(_SCRIPT_OR_COMMENT_RE.sub('', html)):
+                raw_attrs = tag.group(1)
+                if 'hidden' not in raw_attrs:
+                    continue
+                attrs = {}
+                for attr, double_quoted, single_quoted, bare in _INPUT_ATTR_RE.findall(raw_attrs):
+                    attrs.setdefault(attr.lower(), double_quoted or single_quoted or bare)
+                if attrs.get('type') == 'hidden' and attrs.get('name'):
+                    tokens[unescape(attrs['name'])] = unescape(attrs.get('value', ''))
 
         # If no tokens found, try regex as fallback
         if not tokens:
-            logger.debug('BeautifulSoup found no tokens, trying regex fallback')
-            import re
+            logger.debug('No hidden inputs found, trying regex fallback')
             # Extract common ASP.NET tokens
             patterns = [
                 (r'name="(__VIEWSTATE[C]?)" value="([^"]*)"', '__VIEWSTATEC'),
@@ -417,21 +496,11 @@ class WodBusterClient:
 
     def _has_login_error(self, html: str) -> bool:
         """Check if the response contains login error messages."""
-        error_indicators = [
-            'usuario o contraseña incorrectos',
-            'email o contraseña incorrectos',
-            'credenciales incorrectas',
-            'invalid credentials',
-            'login failed',
-        ]
-        html_lower = html.lower()
-        return any(indicator in html_lower for indicator in error_indicators)
+        return _LOGIN_ERROR_RE.search(html) is not None
 
     def _needs_device_confirmation(self, html: str) -> bool:
         """Check if device confirmation is needed."""
-        indicators = ['recordar este dispositivo', 'dispositivo de confianza', 'ctlseguro']
-        html_lower = html.lower()
-        return any(indicator in html_lower for indicator in indicators)
+        return _DEVICE_CONFIRM_RE.search(html) is not None
 
     def _confirm_device(self, response) -> Any:
         """Handle the device confirmation dialog."""
@@ -543,7 +612,6 @@ class WodBusterClient:
 
         # The ticks parameter IS the date - Unix timestamp for midnight UTC
         # Convert local date to midnight UTC and get epoch seconds
-        from datetime import timezone
         target_date = date.date() if hasattr(date, 'date') else date
         midnight_utc = datetime.combine(target_date, datetime.min.time()).replace(tzinfo=timezone.utc)
         epoch = int(midnight_utc.timestamp())
@@ -569,7 +637,7 @@ class WodBusterClient:
             logger.debug(f'LoadClass response text (first 500): {response.text[:500]}')
 
             try:
-                data = response.json()
+                data = _parse_json(response)
             except Exception as json_err:
                 logger.error(f'Failed to parse JSON: {json_err}')
                 logger.error(f'Raw response: {response.text[:1000]}')
@@ -680,7 +748,7 @@ class WodBusterClient:
             logger.debug(f'Booking response status: {response.status_code}')
             logger.debug(f'Booking response text: {response.text[:500]}')
 
-            data = response.json()
+            data = _parse_json(response)
             logger.debug(f'Booking response keys: {list(data.keys()) if isinstance(data, dict) else type(data)}')
 
             # Check for success - API returns result in 'Res' object
@@ -733,7 +801,7 @@ class WodBusterClient:
             logger.debug(f'Cancel response status: {response.status_code}')
             logger.debug(f'Cancel response text: {response.text[:500]}')
 
-            data = response.json()
+            data = _parse_json(response)
             logger.debug(f'Cancel response keys: {list(data.keys()) if isinstance(data, dict) else type(data)}')
 
             # Check for success - API returns result in 'Res' object (same as book_class)
@@ -752,23 +820,54 @@ class WodBusterClient:
             logger.error(f'Error cancelling booking: {e}')
             raise BookingError(f'Cancel error: {str(e)}')
 
-    def get_my_reservations(self, days_ahead: int = 7) -> List[Dict[str, Any]]:
+    def get_classes_range(self, dates: List[datetime]) -> Dict[datetime, List[Dict[str, Any]]]:
+        """
+        Get classes for several days, fetching the days concurrently.
+
+        Args:
+            dates: Days to fetch
+
+        Returns:
+            Dict mapping each date to its classes, in the order given. Days
+            whose request or response fails are logged and left out.
+        """
+        if not dates:
+            return {}
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(len(dates), self.MAX_PARALLEL_DAYS)) as executor:
+            futures = [(date, executor.submit(self.get_classes, date)) for date in dates]
+            for date, future in futures:
+                try:
+                    results[date] = future.result()
+                except (requests.RequestException, ValueError, KeyError) as e:
+                    if logger.isEnabledFor(logging.ERROR):
+                        logger.error(f'Error fetching classes for {date}: {e}')
+
+        return results
+
+    def get_my_reservations(self, days_ahead: int = 7) -> List[Reservation]:
         """Get user's booked classes for the next N days."""
         reservations = []
         today = datetime.now()
-
-        for i in range(days_ahead):
-            target_date = today + timedelta(days=i)
-            try:
-                classes = self.get_classes(target_date)
-                for cls in classes:
-                    if cls.get('is_booked') and cls.get('can_cancel'):
-                        cls['date_obj'] = target_date.strftime('%Y-%m-%d')
-                        cls['day_name'] = target_date.strftime('%A')
-                        reservations.append(cls)
-            except Exception as e:
-                logger.error(f'Error fetching classes for {target_date}: {e}')
-                continue
+        dates = [today + timedelta(days=i) for i in range(days_ahead)]
+
+        for target_date, classes in self.get_classes_range(dates).items():
+            date_str = target_date.strftime('%Y-%m-%d')
+            day_name = target_date.strftime('%A')
+            for cls in classes:
+                if cls.get('is_booked') and cls.get('can_cancel'):
+                    reservations.append(Reservation(
+                        id=cls['id'],
+                        name=cls['name'],
+                        time=cls['time'],
+                        date=cls['date'],
+                        date_str=date_str,
+                        day_name=day_name,
+                        status=cls['status'],
+                        booking_id=cls['booking_id'],
+                        can_cancel=cls['can_cancel'],
+                    ))
 
         return reservations
 
@@ -784,48 +883,29 @@ class WodBusterClient:
             response = self.session.get(url, timeout=self.timeout)
 
             # Don't use raise_for_status() - WodBuster returns 404 but still has content
-            if not response.text or len(response.text) < 100:
+            content = response.content
+            if not content or len(content) < 100:
                 raise Exception('Empty response from WodBuster')
 
-            soup = BeautifulSoup(response.text, 'lxml')
-            logger.debug(f'Account page length: {len(response.text)} chars')
-
-            available_classes = None
-            subscription = None
-            user_name = None
-
-            # Look for the user info div (body_CtlMenu_CtlInfoUser)
-            info_div = soup.find('div', id=re.compile(r'CtlInfoUser', re.I))
-            if info_div:
-                info_text = info_div.get_text()
-                logger.debug(f'Found user info div: {info_text[:100]}')
-
-                # Extract "Bono:X" pattern
-                bono_match = re.search(r'Bono:\s*(\d+)', info_text)
-                if bono_match:
-                    available_classes = int(bono_match.group(1))
-                    logger.debug(f'Found bono credits: {available_classes}')
-
-                # Extract tariff info
-                tarifa_match = re.search(r'Tarifa:\s*([^\n]+)', info_text)
-                if tarifa_match:
-                    subscription = tarifa_match.group(1).strip()
-
-            # Fallback: search entire page for "Bono:" pattern
-            if available_classes is None:
-                page_text = soup.get_text()
-                bono_match = re.search(r'Bono:\s*(\d+)', page_text)
-                if bono_match:
-                    available_classes = int(bono_match.group(1))
-                    logger.debug(f'Found bono credits (fallback): {available_classes}')
-
-            # Find user name from the info panel
-            name_div = soup.find('div', id=re.compile(r'CtlInfoUser', re.I))
-            if name_div:
+            logger.debug(f'Account page length: {len(content)} bytes')
+
+            # Fast path: read the values with regexes, searching only from the
+            # info panel on so earlier page text (scripts, banners) can't win.
+            # A panel with a Tarifa but no Bono (no class credits) is taken as
+            # is. Without the panel or either value, parse the page.
+            text = response.text
+            panel = _INFO_PANEL_RE.search(text)
+            bono_match = _BONO_RE.search(text, panel.start(1)) if panel else None
+            tarifa_match = _TARIFA_RE.search(text, panel.start(1)) if panel else None
+            if bono_match or tarifa_match:
+                available_classes = int(bono_match.group(1)) if bono_match else None
+                subscription = unescape(tarifa_match.group(1)).strip() if tarifa_match else None
                 # Usually the first line is the user name
-                first_text = name_div.get_text().split('\n')[0].strip()
-                if first_text and '@' not in first_text:
-                    user_name = first_text
+                first_text = unescape(panel.group(1)).partition('\n')[0].strip()
+                user_name = first_text if first_text and '@' not in first_text else None
+                logger.debug(f'Account info from page text: bono={available_classes}, tarifa={subscription}')
+            else:
+                available_classes, subscription, user_name = self._parse_account_info_soup(content)
 
             return {
                 'available_classes': available_classes,
@@ -844,12 +924,65 @@ class WodBusterClient:
                 'error': str(e)
             }
 
+    def _parse_account_info_soup(self, content: bytes) -> tuple:
+        """Extract (available_classes, subscription, user_name) by parsing the page."""
+        soup = BeautifulSoup(content, 'lxml')
+
+        available_classes = None
+        subscription = None
+        user_name = None
+
+        # Look for the user info div (body_CtlMenu_CtlInfoUser)
+        info_div = soup.find('div', id=re.compile(r'CtlInfoUser', re.I))
+        if info_div:
+            info_text = info_div.get_text()
+            logger.debug(f'Found user info div: {info_text[:100]}')
+
+            # Extract "Bono:X" pattern
+            bono_match = _BONO_RE.search(info_text)
+            if bono_match:
+                available_classes = int(bono_match.group(1))
+                logger.debug(f'Found bono credits: {available_classes}')
+
+            # Extract tariff info
+            tarifa_match = _TARIFA_RE.search(info_text)
+            if tarifa_match:
+                subscription = tarifa_match.group(1).strip()
+
+            # Usually the first line is the user name
+            first_text = info_text.partition('\n')[0].strip()
+            if first_text and '@' not in first_text:
+                user_name = first_text
+
+        # Fallback: search entire page for "Bono:" pattern
+        if available_classes is None:
+            page_text = soup.get_text()
+            bono_match = _BONO_RE.search(page_text)
+            if bono_match:
+                available_classes = int(bono_match.group(1))
+                logger.debug(f'Found bono credits (fallback): {available_classes}')
+
+        return available_classes, subscription, user_name
+
+    def _get_publication_delay(self, epoch: int) -> Optional[float]:
+        """Get SegundosHastaPublicacion for the day starting at epoch, or None if published."""
+        url = f'{self.box_url}/athlete/handlers/LoadClass.ashx'
+        response = self.session.get(url, params={'ticks': epoch}, timeout=self.timeout)
+        response.raise_for_status()
+
+        seconds_until = _parse_json(response).get('SegundosHastaPublicacion')
+        if seconds_until and seconds_until > 0:
+            return seconds_until
+        return None
+
     def get_booking_open_time(self, days_ahead: int = 7) -> Optional[Dict[str, Any]]:
         """
         Get when reservations open for future classes.
 
-        Checks future dates to find one with SegundosHastaPublicacion,
-        which tells us when that day's classes become bookable.
+        Looks for the first future date with SegundosHastaPublicacion,
+        which tells us when that day's classes become bookable. Days that
+        are already published always come before unpublished ones, so the
+        window is binary searched (about log2(days_ahead) requests).
 
         Returns:
             Dict with 'opens_at' (datetime), 'seconds_until', 'day_of_week', 'hour', 'minute'
@@ -859,48 +992,59 @@ class WodBusterClient:
             raise SessionExpiredError('Not logged in')
 
         today = datetime.now()
-
-        # Check each day ahead to find one with SegundosHastaPublicacion
-        for i in range(1, days_ahead + 1):
-            target_date = today + timedelta(days=i)
-
+        # Midnight UTC of today; each following day is exactly 86400 seconds later
+        today_epoch = int(datetime.combine(today.date(), datetime.min.time(), tzinfo=timezone.utc).timestamp())
+
+        found = None  # (days from today, seconds until publication)
+        remaining = []
+        lo, hi = 1, days_ahead
+        while lo <= hi:
+            mid = (lo + hi) // 2
             try:
-                # Get raw response to access SegundosHastaPublicacion
-                from datetime import timezone
-                target_date_only = target_date.date()
-                midnight_utc = datetime.combine(target_date_only, datetime.min.time()).replace(tzinfo=timezone.utc)
-                epoch = int(midnight_utc.timestamp())
-
-                url = f'{self.box_url}/athlete/handlers/LoadClass.ashx'
-                params = {'ticks': epoch}
-
-                response = self.session.get(url, params=params, timeout=self.timeout)
-                response.raise_for_status()
-
-                data = response.json()
+                seconds_until = self._get_publication_delay(today_epoch + mid * 86400)
+            except (requests.RequestException, ValueError, KeyError) as e:
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning(f'Error checking booking open time for {today + timedelta(days=mid)}: {e}')
+                # Can't tell which side the boundary is on - check the rest one by one
+                remaining = [i for i in range(lo, hi + 1) if i != mid]
+                break
+
+            if seconds_until:
+                found = (mid, seconds_until)
+                hi = mid - 1
+            else:
+                lo = mid + 1
 
-                seconds_until = data.get('SegundosHastaPublicacion')
+        for i in remaining:
+            try:
+                seconds_until = self._get_publication_delay(today_epoch + i * 86400)
+            except (requests.RequestException, ValueError, KeyError) as e:
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning(f'Error checking booking open time for {today + timedelta(days=i)}: {e}')
+                continue
+            if seconds_until:
+                found = (i, seconds_until)
+                break
 
-                if seconds_until and seconds_until > 0:
-                    # Calculate when reservations open
-                    opens_at = datetime.now() + timedelta(seconds=seconds_until)
+        if found is None:
+            return None
 
-                    logger.info(f'Found booking open time: {opens_at} (in {seconds_until:.0f} seconds)')
+        days, seconds_until = found
+        target_date_only = (today + timedelta(days=days)).date()
 
-                    return {
-                        'opens_at': opens_at,
-                        'seconds_until': seconds_until,
-                        'day_of_week': opens_at.weekday(),
-                        'hour': opens_at.hour,
-                        'minute': opens_at.minute,
-                        'target_date': target_date_only.isoformat(),
-                    }
+        # Calculate when reservations open
+        opens_at = datetime.now() + timedelta(seconds=seconds_until)
 
-            except Exception as e:
-                logger.warning(f'Error checking booking open time for {target_date}: {e}')
-                continue
+        logger.info(f'Found booking open time: {opens_at} (in {seconds_until:.0f} seconds)')
 
-        return None
+        return {
+            'opens_at': opens_at,
+            'seconds_until': seconds_until,
+            'day_of_week': opens_at.weekday(),
+            'hour': opens_at.hour,
+            'minute': opens_at.minute,
+            'target_date': target_date_only.isoformat(),
+        }
 
     def find_class(
         self,
@@ -910,33 +1054,63 @@ class WodBusterClient:
     ) -> Optional[Dict[str, Any]]:
         """Find a specific class by date, time, and type.
 
+        Each day's classes are fetched once per client and indexed by start
+        time; a lookup that misses the index refetches the day, in case the
+        class was published since.
+
         Raises:
             NoClassesAvailableError: If no classes exist for the given date (holiday/closed)
         """
+        if not self._logged_in:
+            raise SessionExpiredError('Not logged in')
+
+        day = date.date() if hasattr(date, 'date') else date
+        target_time = time_str.replace(':', '')[:4]
+        class_type_lower = class_type.lower()
+
+        by_time = self._class_index.get(day)
+        if by_time is not None:
+            cls = self._match_class(by_time, target_time, class_type_lower)
+            if cls is not None:
+                return cls
+
         classes = self.get_classes(date)
 
         # If no classes at all for this day, it's likely a holiday or closed day
         if not classes:
             raise NoClassesAvailableError(f'No classes available for {date.strftime("%Y-%m-%d")} (holiday or closed)')
 
-        target_time = time_str.replace(':', '')[:4]
         logger.info(f'Searching for class: type="{class_type}", time={target_time}')
-        logger.info(f'Available classes ({len(classes)}):')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'Available classes ({len(classes)}):')
+            for cls in classes:
+                logger.debug(f'  - {cls.get("time", "?")} {cls.get("name", "?")} (can_book={cls.get("can_book")}, status={cls.get("status")})')
+
+        # Index classes by start time so only same-time classes are compared,
+        # lowercasing each name once rather than on every lookup
+        by_time = {}
         for cls in classes:
-            logger.info(f'  - {cls.get("time", "?")} {cls.get("name", "?")} (can_book={cls.get("can_book")}, status={cls.get("status")})')
-
-        for cls in classes:
-            cls_time = cls.get('time', '').replace(':', '')[:4]
-
-            if cls_time != target_time:
-                continue
-
-            cls_name = cls.get('name', '').lower()
-            if class_type.lower() in cls_name:
+            by_time.setdefault(cls.get('time', '').replace(':', '')[:4], []).append(
+                (cls.get('name', '').lower(), cls)
+            )
+        self._class_index[day] = by_time
+
+        cls = self._match_class(by_time, target_time, class_type_lower)
+        if cls is None:
+            logger.warning(f'No class found matching type="{class_type}" at time={target_time}')
+        return cls
+
+    @staticmethod
+    def _match_class(
+        by_time: Dict[str, List[tuple]],
+        target_time: str,
+        class_type_lower: str
+    ) -> Optional[Dict[str, Any]]:
+        """Return the first class at target_time whose name contains the type."""
+        for name_lower, cls in by_time.get(target_time, ()):
+            if class_type_lower in name_lower:
                 logger.info(f'Found matching class: {cls}')
                 return cls
-
-        logger.warning(f'No class found matching type="{class_type}" at time={target_time}')
         return None
 
     @classmethod
@@ -20,26 +20,31 @@ def configure_logging():
     This setup is container-friendly:
     - stdout: DEBUG, INFO, WARNING (normal operation)
     - stderr: ERROR, CRITICAL (errors and failures)
+
+    Handlers are only added if the root logger has none yet, so re-importing
+    this module (reloader, workers, tests) doesn't duplicate log records;
+    the logger levels below are always applied.
     """
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
 
-    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    formatter = logging.Formatter(log_format)
+    if not root_logger.handlers:
+        log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        formatter = logging.Formatter(log_format)
 
-    # Handler for stdout (DEBUG, INFO, WARNING)
-    stdout_handler = logging.StreamHandler(sys.stdout)
-    stdout_handler.setLevel(logging.DEBUG)
-    stdout_handler.addFilter(StdoutFilter())
-    stdout_handler.setFormatter(formatter)
+        # Handler for stdout (DEBUG, INFO, WARNING)
+        stdout_handler = logging.StreamHandler(sys.stdout)
+        stdout_handler.setLevel(logging.DEBUG)
+        stdout_handler.addFilter(StdoutFilter())
+        stdout_handler.setFormatter(formatter)
 
-    # Handler for stderr (ERROR, CRITICAL)
-    stderr_handler = logging.StreamHandler(sys.stderr)
-    stderr_handler.setLevel(logging.ERROR)
-    stderr_handler.setFormatter(formatter)
+        # Handler for stderr (ERROR, CRITICAL)
+        stderr_handler = logging.StreamHandler(sys.stderr)
+        stderr_handler.setLevel(logging.ERROR)
+        stderr_handler.setFormatter(formatter)
 
-    root_logger.addHandler(stdout_handler)
-    root_logger.addHandler(stderr_handler)
+        root_logger.addHandler(stdout_handler)
+        root_logger.addHandler(stderr_handler)
 
     # Reduce noise from external libraries
     logging.getLogger('urllib3').setLevel(logging.WARNING)
@@ -1,49 +1,139 @@
 """Pytest fixtures for WodSniper tests."""
 
+import json
 import pytest
 from unittest.mock import Mock, MagicMock, patch
 from datetime import datetime
-import tempfile
+from functools import partial
+from types import SimpleNamespace
+import sqlite3
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
-@pytest.fixture
-def app():
-    """Create Flask application for testing."""
-    from app import create_app
+@pytest.fixture(scope='session', autouse=True)
+def fast_password_hashing():
+    """Hash passwords with a single PBKDF2 iteration instead of scrypt.
+
+    check_password_hash() reads the method from the stored hash, so
+    verifying these hashes on login is just as cheap.
+    """
+    from werkzeug.security import generate_password_hash
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('app.models.generate_password_hash',
+                   partial(generate_password_hash, method='pbkdf2:sha256:1'))
+        yield
+
+
+@pytest.fixture(autouse=True)
+def real_password_hashing(request, monkeypatch):
+    """Restore the production password hasher for tests marked real_hash."""
+    if request.node.get_closest_marker('real_hash'):
+        from werkzeug.security import generate_password_hash
+
+        monkeypatch.setattr('app.models.generate_password_hash', generate_password_hash)
+
+
+def _restore_db(app, snapshot):
+    """Overwrite the app's in-memory database with a snapshot connection."""
     from app.models import db
 
-    # Create a temporary database file
-    db_fd, db_path = tempfile.mkstemp()
+    with app.app_context():
+        raw = db.engine.raw_connection()
+        try:
+            snapshot.backup(raw.driver_connection)
+        finally:
+            raw.close()
+
+
+@pytest.fixture(scope='session')
+def session_app():
+    """Create the Flask application once for the whole test session.
+
+    Yields the app and a snapshot of its freshly created (empty) database.
+    """
+    from app import create_app
+    from app.models import db
 
     app = create_app('testing')
     app.config.update({
         'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
         'WTF_CSRF_ENABLED': False,
+        'WTF_CSRF_CHECK_DEFAULT': False,
         'SECRET_KEY': 'test-secret-key',
         'SERVER_NAME': 'localhost',
     })
+    # Compiled templates stay cached on the session-wide app; never stat the
+    # template files for changes, even when FLASK_DEBUG is set.
+    app.jinja_env.auto_reload = False
 
+    clean_db = sqlite3.connect(':memory:', check_same_thread=False)
     with app.app_context():
         db.create_all()
+        raw = db.engine.raw_connection()
+        try:
+            raw.driver_connection.backup(clean_db)
+        finally:
+            raw.close()
 
-    yield app
+    yield app, clean_db
 
-    # Cleanup
-    os.close(db_fd)
-    os.unlink(db_path)
+    clean_db.close()
 
 
 @pytest.fixture
-def client(app):
-    """Create test client."""
+def app(session_app):
+    """Flask application for testing, with an empty database for each test.
+
+    The app and schema are created once per session; restoring the empty
+    snapshot resets all tables without running drop_all/create_all.
+    """
+    app, clean_db = session_app
+    _restore_db(app, clean_db)
+    return app
+
+
+@pytest.fixture(autouse=True)
+def app_context(request):
+    """Push an application context for every test that uses the app."""
+    if 'app' not in request.fixturenames:
+        yield
+        return
+
+    with request.getfixturevalue('app').app_context():
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _no_email(monkeypatch):
+    """Never send real emails from the auth routes.
+
+    Tests that assert on sending replace these with a MagicMock.
+    """
+    monkeypatch.setattr('app.auth.routes.send_verification_email', lambda *args, **kwargs: None)
+    monkeypatch.setattr('app.auth.routes.send_password_reset_email', lambda *args, **kwargs: None)
+
+
+@pytest.fixture(scope='session')
+def session_client(session_app):
+    """Test client shared by the whole test session."""
+    app, _ = session_app
     return app.test_client()
 
 
+@pytest.fixture
+def client(app, session_client):
+    """Test client with no session or remember-me cookie left from earlier tests."""
+    from flask_login import COOKIE_NAME
+
+    session_client.delete_cookie(app.config['SESSION_COOKIE_NAME'])
+    session_client.delete_cookie(app.config.get('REMEMBER_COOKIE_NAME', COOKIE_NAME))
+    return session_client
+
+
 @pytest.fixture
 def runner(app):
     """Create test CLI runner."""
@@ -55,23 +145,61 @@ def db_session(app):
     """Create database session for testing."""
     from app.models import db
 
-    with app.app_context():
-        yield db.session
-        db.session.rollback()
+    yield db.session
+    db.session.rollback()
 
 
-@pytest.fixture
-def test_user(app):
-    """Create a test user."""
+@pytest.fixture(scope='session')
+def seeded_db():
+    """In-memory SQLite database with the schema and the test user.
+
+    Built (and the password hashed) once per session; test_user copies it
+    into each test's database with sqlite3's backup API.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from sqlalchemy.pool import StaticPool
     from app.models import db, User
 
-    with app.app_context():
+    template = sqlite3.connect(':memory:', check_same_thread=False)
+    engine = create_engine('sqlite://', creator=lambda: template, poolclass=StaticPool)
+    db.metadata.create_all(engine)
+
+    with Session(engine) as session:
         user = User(email='test@example.com')
         user.set_password('testpassword123')
         user.email_verified = True
-        db.session.add(user)
-        db.session.commit()
-        yield user
+        session.add(user)
+        session.commit()
+
+    yield template
+    template.close()
+
+
+@pytest.fixture(scope='session')
+def test_user_reset_token(session_app):
+    """Password reset token for the test user, signed once per session."""
+    from app.models import User
+
+    app, _ = session_app
+    with app.app_context():
+        return User(email='test@example.com').get_reset_token()
+
+
+@pytest.fixture
+def test_user(app, seeded_db, test_user_reset_token):
+    """Create a test user.
+
+    The user's password reset token is available as ``_reset_token``.
+    """
+    from app.models import User
+
+    # Replace the empty test database with the seeded snapshot
+    _restore_db(app, seeded_db)
+
+    user = User.query.filter_by(email='test@example.com').first()
+    user._reset_token = test_user_reset_token
+    return user
 
 
 @pytest.fixture
@@ -177,31 +305,111 @@ def sample_booking_full():
 
 
 @pytest.fixture
-def mock_booking():
-    """Mock Booking model."""
-    booking = Mock()
-    booking.id = 1
-    booking.day_of_week = 0  # Monday
-    booking.time = '07:00'
-    booking.class_type = 'crossfit'
-    booking.day_name = 'Monday'
-    booking.is_active = True
-    booking.status = 'pending'
-    booking.success_count = 0
-    booking.fail_count = 0
-    booking.last_error = None
-    booking.last_attempt = None
-    return booking
+def mock_session_factory():
+    """Build mock scraper sessions whose GET requests return a JSON payload.
+
+    The payload may also be a function of the request params, called on each
+    GET; it can raise to make that request fail.
+    """
+    def respond(payload):
+        body = json.dumps(payload)
+        response = Mock(text=body, content=body.encode(), raise_for_status=lambda: None)
+        response.json.return_value = payload
+        return response
+
+    def make(payload):
+        session = MagicMock()
+        if callable(payload):
+            session.get.side_effect = lambda url, params=None, **kwargs: respond(payload(params))
+        else:
+            session.get.return_value = respond(payload)
+        return session
+
+    return make
+
+
+@pytest.fixture
+def mock_booking(mock_user):
+    """Stand-in for a Booking owned by mock_user."""
+    return SimpleNamespace(
+        id=1,
+        day_of_week=0,  # Monday
+        time='07:00',
+        class_type='crossfit',
+        day_name='Monday',
+        is_active=True,
+        status='pending',
+        success_count=0,
+        fail_count=0,
+        last_error=None,
+        last_attempt=None,
+        user=mock_user,
+    )
 
 
 @pytest.fixture
 def mock_user():
-    """Mock User model."""
-    user = Mock()
-    user.id = 1
-    user.email = 'test@example.com'
-    user.box_url = 'https://testbox.wodbuster.com'
-    user.wodbuster_email = 'test@wodbuster.com'
-    user.get_wodbuster_cookies.return_value = {'.WBAuth': 'test_cookie'}
-    user.get_wodbuster_password.return_value = 'test_password'
-    return user
+    """Stand-in for a User with a connected WodBuster account."""
+    return SimpleNamespace(
+        id=1,
+        email='test@example.com',
+        box_url='https://testbox.wodbuster.com',
+        effective_box_url='https://testbox.wodbuster.com',
+        wodbuster_email='test@wodbuster.com',
+        get_wodbuster_cookies=lambda: {'.WBAuth': 'test_cookie'},
+        get_wodbuster_password=lambda: 'test_password',
+    )
+
+
+class FakeWBClient:
+    """Lightweight stand-in for WodBusterClient in route tests.
+
+    The names of the methods called on any instance are recorded, in
+    order, in the class-level ``calls`` list.
+    """
+
+    calls = []
+
+    def __init__(self, box_url, *args, **kwargs):
+        self.box_url = box_url
+
+    @staticmethod
+    def detect_box_url(email, password):
+        return 'https://testbox.wodbuster.com'
+
+    def login(self, email, password):
+        self.calls.append('login')
+        return True
+
+    def restore_session(self, cookies):
+        self.calls.append('restore_session')
+        return True
+
+    def get_cookies(self):
+        self.calls.append('get_cookies')
+        return {'.WBAuth': 'token'}
+
+    def get_booking_open_time(self, *args, **kwargs):
+        self.calls.append('get_booking_open_time')
+        return None
+
+    def get_account_info(self):
+        self.calls.append('get_account_info')
+        return {'available_classes': 10}
+
+    def find_class(self, target_date, time, class_type):
+        self.calls.append('find_class')
+        return {'id': 123, 'name': 'CrossFit'}
+
+    def book_class(self, class_id):
+        self.calls.append('book_class')
+        return True
+
+
+@pytest.fixture
+def fake_wb_client(monkeypatch):
+    """Replace WodBusterClient in the route modules with FakeWBClient."""
+    monkeypatch.setattr(FakeWBClient, 'calls', [])
+    monkeypatch.setattr('app.auth.routes.WodBusterClient', FakeWBClient)
+    monkeypatch.setattr('app.booking.routes.WodBusterClient', FakeWBClient)
+    return FakeWBClient
@@ -0,0 +1,39 @@
+"""factory_boy factories for WodSniper models."""
+
+import factory
+from factory.alchemy import SQLAlchemyModelFactory
+
+from app import models
+from app.models import db, User, Booking
+
+
+class UserFactory(SQLAlchemyModelFactory):
+    """Verified user with password 'password'."""
+
+    class Meta:
+        model = User
+        sqlalchemy_session = db.session
+        sqlalchemy_session_persistence = 'flush'
+
+    class Params:
+        password = 'password'
+
+    email = factory.Sequence(lambda n: f'user{n}@example.com')
+    email_verified = True
+    # Hashed before the row is flushed (password_hash is NOT NULL); looked up
+    # on app.models so the test session's fast hasher applies.
+    password_hash = factory.LazyAttribute(lambda o: models.generate_password_hash(o.password))
+
+
+class BookingFactory(SQLAlchemyModelFactory):
+    """Active Monday 07:00 CrossFit booking."""
+
+    class Meta:
+        model = Booking
+        sqlalchemy_session = db.session
+        sqlalchemy_session_persistence = 'flush'
+
+    user = factory.SubFactory(UserFactory)
+    day_of_week = 0
+    time = '07:00'
+    class_type = 'CrossFit'
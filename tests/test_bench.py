@@ -0,0 +1,60 @@
+"""Microbenchmarks for model hot paths.
+
+Skipped by default (see pytest.ini); run with
+``pytest tests/test_bench.py --benchmark-only``.
+"""
+
+import pytest
+
+from app.models import User, Booking
+
+
+class TestPasswordBenchmarks:
+    """Password hashing cost with the production KDF."""
+
+    @pytest.mark.real_hash
+    def test_set_password(self, benchmark):
+        """Should time hashing a new password."""
+        user = User(email='bench@example.com')
+        benchmark(user.set_password, 'password123')
+
+    @pytest.mark.real_hash
+    def test_check_password(self, benchmark):
+        """Should time verifying a correct password."""
+        user = User(email='bench@example.com')
+        user.set_password('password123')
+        assert benchmark(user.check_password, 'password123') is True
+
+
+class TestWodBusterCredentialBenchmarks:
+    """Stored WodBuster cookie and password round trips."""
+
+    def test_cookies_round_trip(self, benchmark):
+        """Should time storing and reading back the WodBuster cookies."""
+        user = User(email='bench@example.com')
+        cookies = {'.WBAuth': 'auth_token', 'cf_clearance': 'cf_token'}
+
+        def round_trip():
+            user.set_wodbuster_cookies(cookies)
+            return user.get_wodbuster_cookies()
+
+        assert benchmark(round_trip) == cookies
+
+    def test_password_round_trip(self, benchmark):
+        """Should time encrypting and decrypting the WodBuster password."""
+        user = User(email='bench@example.com')
+
+        def round_trip():
+            user.set_wodbuster_password('wodbuster_password')
+            return user.get_wodbuster_password()
+
+        assert benchmark(round_trip) == 'wodbuster_password'
+
+
+class TestBookingBenchmarks:
+    """Booking attribute access."""
+
+    def test_day_name(self, benchmark):
+        """Should time reading the booking's day name."""
+        booking = Booking(day_of_week=4, time='07:00', class_type='CrossFit')
+        assert benchmark(lambda: booking.day_name) == 'Friday'
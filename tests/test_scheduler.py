@@ -2,166 +2,96 @@
 
 import pytest
 from unittest.mock import Mock, MagicMock, patch, call
-from datetime import datetime, timedelta
+from datetime import date, datetime
 import time
 
+from app.scheduler import (
+    _process_single_booking, _process_single_booking_with_client, next_weekday, refresh_all_sessions,
+    MAX_RETRY_ATTEMPTS, RETRY_DELAY, MAX_PARALLEL_USERS
+)
+from app.scraper.exceptions import BookingError, ClassFullError
+
+_FIXED_DT = datetime(2024, 12, 8)  # Sunday
+
 
 class TestRetryLogic:
     """Tests for booking retry logic."""
 
-    @patch('app.scheduler.time.sleep')
-    @patch('app.scraper.WodBusterClient')
-    def test_successful_booking_on_first_attempt(self, mock_client_class, mock_sleep):
+    @pytest.fixture(autouse=True)
+    def stub_models(self, monkeypatch):
+        """Keep the booking logs and commits away from the database."""
+        monkeypatch.setattr('app.models.db', MagicMock())
+        monkeypatch.setattr('app.models.BookingLog', MagicMock())
+
+    @pytest.fixture
+    def mock_sleep(self):
+        """Records retry delays instead of sleeping."""
+        return Mock()
+
+    @pytest.fixture
+    def mock_client(self, monkeypatch):
+        """WodBusterClient instance with a restored session and a found class.
+
+        Tests only need to configure book_class.
+        """
+        client = MagicMock()
+        client.restore_session.return_value = True
+        client.find_class.return_value = {'id': 123, 'name': 'CrossFit'}
+        monkeypatch.setattr('app.scraper.WodBusterClient', MagicMock(return_value=client))
+        return client
+
+    def test_successful_booking_on_first_attempt(self, mock_client, mock_booking, mock_sleep):
         """Should succeed on first attempt without retries."""
-        from app.scheduler import _process_single_booking, MAX_RETRY_ATTEMPTS
-
-        # Setup mocks
-        mock_client = MagicMock()
-        mock_client.restore_session.return_value = True
-        mock_client.find_class.return_value = {'id': 123, 'name': 'CrossFit'}
         mock_client.book_class.return_value = True
-        mock_client_class.return_value = mock_client
-
-        mock_booking = Mock()
-        mock_booking.id = 1
-        mock_booking.day_of_week = 0
-        mock_booking.time = '07:00'
-        mock_booking.class_type = 'crossfit'
-        mock_booking.day_name = 'Monday'
-        mock_booking.success_count = 0
-        mock_booking.fail_count = 0
-        mock_booking.user = Mock()
-        mock_booking.user.id = 1
-        mock_booking.user.email = 'test@test.com'
-        mock_booking.user.box_url = 'https://test.wodbuster.com'
-        mock_booking.user.get_wodbuster_cookies.return_value = {'.WBAuth': 'cookie'}
-        mock_booking.user.get_wodbuster_password.return_value = 'password'
 
         mock_app = MagicMock()
 
-        with patch('app.models.db') as mock_db, \
-             patch('app.models.BookingLog'):
-            result = _process_single_booking(mock_booking, mock_app)
+        _process_single_booking(mock_booking, mock_app, sleep=mock_sleep)
 
         assert mock_booking.status == 'success'
         assert mock_booking.success_count == 1
         # Should not have called sleep for retries
         assert mock_sleep.call_count == 0
 
-    @patch('app.scheduler.RETRY_DELAY', 0.01)  # Fast retries for testing
-    @patch('app.scheduler.time.sleep')
-    @patch('app.scraper.WodBusterClient')
-    def test_retries_on_booking_error(self, mock_client_class, mock_sleep):
+    def test_retries_on_booking_error(self, mock_client, mock_booking, mock_sleep):
         """Should retry on BookingError."""
-        from app.scheduler import _process_single_booking, MAX_RETRY_ATTEMPTS
-        from app.scraper.exceptions import BookingError
-
-        # Setup mocks - fail twice, succeed on third
-        mock_client = MagicMock()
-        mock_client.restore_session.return_value = True
-        mock_client.find_class.return_value = {'id': 123, 'name': 'CrossFit'}
+        # Fail twice, succeed on third
         mock_client.book_class.side_effect = [
             BookingError('Network error'),
             BookingError('Network error'),
             True  # Success on third attempt
         ]
-        mock_client_class.return_value = mock_client
-
-        mock_booking = Mock()
-        mock_booking.id = 1
-        mock_booking.day_of_week = 0
-        mock_booking.time = '07:00'
-        mock_booking.class_type = 'crossfit'
-        mock_booking.day_name = 'Monday'
-        mock_booking.success_count = 0
-        mock_booking.fail_count = 0
-        mock_booking.user = Mock()
-        mock_booking.user.id = 1
-        mock_booking.user.email = 'test@test.com'
-        mock_booking.user.box_url = 'https://test.wodbuster.com'
-        mock_booking.user.get_wodbuster_cookies.return_value = {'.WBAuth': 'cookie'}
 
         mock_app = MagicMock()
 
-        with patch('app.models.db') as mock_db, \
-             patch('app.models.BookingLog'):
-            result = _process_single_booking(mock_booking, mock_app)
+        _process_single_booking(mock_booking, mock_app, sleep=mock_sleep)
 
         assert mock_booking.status == 'success'
         assert mock_client.book_class.call_count == 3
         # Should have slept twice between retries
         assert mock_sleep.call_count == 2
 
-    @patch('app.scheduler.RETRY_DELAY', 0.01)
-    @patch('app.scheduler.time.sleep')
-    @patch('app.scraper.WodBusterClient')
-    def test_no_retry_on_class_full(self, mock_client_class, mock_sleep):
+    def test_no_retry_on_class_full(self, mock_client, mock_booking, mock_sleep):
         """Should NOT retry when class is full."""
-        from app.scheduler import _process_single_booking
-        from app.scraper.exceptions import ClassFullError
-
-        mock_client = MagicMock()
-        mock_client.restore_session.return_value = True
-        mock_client.find_class.return_value = {'id': 123, 'name': 'CrossFit'}
         mock_client.book_class.side_effect = ClassFullError('Class is full')
-        mock_client_class.return_value = mock_client
-
-        mock_booking = Mock()
-        mock_booking.id = 1
-        mock_booking.day_of_week = 0
-        mock_booking.time = '07:00'
-        mock_booking.class_type = 'crossfit'
-        mock_booking.day_name = 'Monday'
-        mock_booking.user = Mock()
-        mock_booking.user.id = 1
-        mock_booking.user.email = 'test@test.com'
-        mock_booking.user.box_url = 'https://test.wodbuster.com'
-        mock_booking.user.get_wodbuster_cookies.return_value = {'.WBAuth': 'cookie'}
 
         mock_app = MagicMock()
 
-        with patch('app.models.db') as mock_db, \
-             patch('app.models.BookingLog'):
-            result = _process_single_booking(mock_booking, mock_app)
+        _process_single_booking(mock_booking, mock_app, sleep=mock_sleep)
 
         assert mock_booking.status == 'waiting'
         # Should only try once - no retries for full class
         assert mock_client.book_class.call_count == 1
         assert mock_sleep.call_count == 0
 
-    @patch('app.scheduler.RETRY_DELAY', 0.01)
     @patch('app.scheduler.MAX_RETRY_ATTEMPTS', 3)
-    @patch('app.scheduler.time.sleep')
-    @patch('app.scraper.WodBusterClient')
-    def test_fails_after_max_retries(self, mock_client_class, mock_sleep):
+    def test_fails_after_max_retries(self, mock_client, mock_booking, mock_sleep):
         """Should mark as failed after max retries."""
-        from app.scheduler import _process_single_booking
-        from app.scraper.exceptions import BookingError
-
-        mock_client = MagicMock()
-        mock_client.restore_session.return_value = True
-        mock_client.find_class.return_value = {'id': 123, 'name': 'CrossFit'}
         mock_client.book_class.side_effect = BookingError('Persistent error')
-        mock_client_class.return_value = mock_client
-
-        mock_booking = Mock()
-        mock_booking.id = 1
-        mock_booking.day_of_week = 0
-        mock_booking.time = '07:00'
-        mock_booking.class_type = 'crossfit'
-        mock_booking.day_name = 'Monday'
-        mock_booking.fail_count = 0
-        mock_booking.user = Mock()
-        mock_booking.user.id = 1
-        mock_booking.user.email = 'test@test.com'
-        mock_booking.user.box_url = 'https://test.wodbuster.com'
-        mock_booking.user.get_wodbuster_cookies.return_value = {'.WBAuth': 'cookie'}
 
         mock_app = MagicMock()
 
-        with patch('app.models.db') as mock_db, \
-             patch('app.models.BookingLog'):
-            result = _process_single_booking(mock_booking, mock_app)
+        _process_single_booking(mock_booking, mock_app, sleep=mock_sleep)
 
         assert mock_booking.status == 'failed'
         assert mock_booking.fail_count == 1
@@ -169,40 +99,50 @@ class TestRetryLogic:
         assert mock_booking.last_error == 'Persistent error'
 
 
-class TestTargetDateCalculation:
-    """Tests for target date calculation."""
+    def test_with_client_retries_on_booking_error(self, mock_booking, mock_sleep):
+        """Should retry on BookingError with an already logged-in client."""
+        client = MagicMock()
+        client.find_class.return_value = {'id': 123, 'name': 'CrossFit'}
+        client.book_class.side_effect = [BookingError('Network error'), True]
 
-    def test_calculates_next_monday_from_sunday(self):
-        """Should calculate next Monday when today is Sunday."""
-        # Sunday = 6, Monday = 0
-        with patch('app.scheduler.datetime') as mock_datetime:
-            mock_datetime.now.return_value = datetime(2024, 12, 8)  # Sunday
-            mock_datetime.utcnow.return_value = datetime(2024, 12, 8)
+        result = _process_single_booking_with_client(
+            mock_booking, client, MagicMock(), mock_booking.user, sleep=mock_sleep
+        )
 
-            # day_of_week = 0 (Monday)
-            today = datetime(2024, 12, 8)  # Sunday
-            days_ahead = 0 - today.weekday()  # 0 - 6 = -6
-            if days_ahead <= 0:
-                days_ahead += 7  # -6 + 7 = 1
+        assert result['status'] == 'success'
+        assert client.book_class.call_count == 2
+        mock_sleep.assert_called_once_with(RETRY_DELAY)
 
-            target = today + timedelta(days=days_ahead)
+    @patch('app.scheduler.MAX_RETRY_ATTEMPTS', 3)
+    def test_with_client_fails_after_max_retries(self, mock_booking, mock_sleep):
+        """Should sleep between attempts and fail once retries run out."""
+        client = MagicMock()
+        client.find_class.side_effect = RuntimeError('Unexpected page')
 
-            assert target.weekday() == 0  # Monday
-            assert target == datetime(2024, 12, 9)
+        result = _process_single_booking_with_client(
+            mock_booking, client, MagicMock(), mock_booking.user, sleep=mock_sleep
+        )
 
-    def test_calculates_next_friday_from_sunday(self):
-        """Should calculate next Friday when today is Sunday."""
-        today = datetime(2024, 12, 8)  # Sunday
-        day_of_week = 4  # Friday
+        assert result['status'] == 'failed'
+        assert client.find_class.call_count == 3
+        assert mock_sleep.call_args_list == [call(RETRY_DELAY)] * 2
 
-        days_ahead = day_of_week - today.weekday()  # 4 - 6 = -2
-        if days_ahead <= 0:
-            days_ahead += 7  # -2 + 7 = 5
+class TestTargetDateCalculation:
+    """Tests for target date calculation."""
 
-        target = today + timedelta(days=days_ahead)
+    @pytest.mark.parametrize('day_of_week,expected', [
+        (0, datetime(2024, 12, 9)),   # Monday
+        (4, datetime(2024, 12, 13)),  # Friday
+        (5, datetime(2024, 12, 14)),  # Saturday
+        (6, datetime(2024, 12, 15)),  # Sunday: a week ahead, never today
+    ])
+    def test_next_weekday_from_sunday(self, day_of_week, expected):
+        """Should return the next matching day after today."""
+        assert next_weekday(_FIXED_DT, day_of_week) == expected
 
-        assert target.weekday() == 4  # Friday
-        assert target == datetime(2024, 12, 13)
+    def test_next_weekday_accepts_dates(self):
+        """Should work on plain dates as well as datetimes."""
+        assert next_weekday(date(2024, 12, 9), 0) == date(2024, 12, 16)
 
 
 class TestSchedulerConfig:
@@ -210,15 +150,11 @@ class TestSchedulerConfig:
 
     def test_retry_constants_exist(self):
         """Should have retry configuration constants."""
-        from app.scheduler import MAX_RETRY_ATTEMPTS, RETRY_DELAY
-
         assert MAX_RETRY_ATTEMPTS == 3
         assert RETRY_DELAY == 1
 
     def test_max_parallel_users_exists(self):
         """Should have max parallel users constant."""
-        from app.scheduler import MAX_PARALLEL_USERS
-
         assert MAX_PARALLEL_USERS == 50
 
 
@@ -228,8 +164,6 @@ class TestSessionRefresh:
     @patch('app.scraper.WodBusterClient')
     def test_refreshes_sessions_for_users_with_bookings(self, mock_client_class):
         """Should refresh sessions for users with active bookings."""
-        from app.scheduler import refresh_all_sessions
-
         mock_client = MagicMock()
         mock_client.login.return_value = True
         mock_client.get_cookies.return_value = {'.WBAuth': 'new_cookie'}
@@ -1,14 +1,27 @@
 """Tests for WodBuster scraper client."""
 
+import json
 import pytest
 from unittest.mock import Mock, MagicMock, patch
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 
-from app.scraper.client import WodBusterClient
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from app.scraper.client import Reservation, WodBusterClient
 from app.scraper.exceptions import (
-    LoginError, ClassNotFoundError, ClassFullError, BookingError
+    LoginError, ClassNotFoundError, ClassFullError, BookingError, SessionExpiredError
 )
 
+_FIXED_DAY = datetime(2024, 12, 15)  # Matches sample_classes_response's Title
+
+
+@pytest.fixture(scope='module')
+def wb_client():
+    """Client shared by the tests that only call its stateless HTML helpers."""
+    return WodBusterClient('https://test.wodbuster.com')
+
 
 class TestWodBusterClientInit:
     """Tests for WodBusterClient initialization."""
@@ -33,94 +46,97 @@ class TestWodBusterClientInit:
 class TestTokenExtraction:
     """Tests for ASP.NET token extraction."""
 
-    def test_extracts_viewstate_token(self, sample_login_html):
+    def test_extracts_viewstate_token(self, wb_client, sample_login_html):
         """Should extract __VIEWSTATE token."""
-        client = WodBusterClient('https://test.wodbuster.com')
-        tokens = client._extract_form_tokens(sample_login_html)
+        tokens = wb_client._extract_form_tokens(sample_login_html)
         assert tokens.get('__VIEWSTATE') == 'viewstate_value'
 
-    def test_extracts_viewstatec_token(self, sample_login_html):
+    def test_extracts_viewstatec_token(self, wb_client, sample_login_html):
         """Should extract __VIEWSTATEC token."""
-        client = WodBusterClient('https://test.wodbuster.com')
-        tokens = client._extract_form_tokens(sample_login_html)
+        tokens = wb_client._extract_form_tokens(sample_login_html)
         assert tokens.get('__VIEWSTATEC') == 'viewstatec_value'
 
-    def test_extracts_csrf_token(self, sample_login_html):
+    def test_extracts_csrf_token(self, wb_client, sample_login_html):
         """Should extract CSRFToken."""
-        client = WodBusterClient('https://test.wodbuster.com')
-        tokens = client._extract_form_tokens(sample_login_html)
+        tokens = wb_client._extract_form_tokens(sample_login_html)
         assert tokens.get('CSRFToken') == 'csrf_token_value'
 
-    def test_returns_empty_dict_for_empty_html(self):
+    def test_extracts_hidden_inputs_in_any_attribute_form(self, wb_client):
+        """Should read hidden inputs regardless of attribute order and quoting."""
+        html = (
+            '<input value="a&amp;b" name="__VIEWSTATE" type="hidden" />'
+            "<input type='hidden' name='ctl00$Field' value='x>y'>"
+            '<input type="text" name="ctl00$Email" value="me@example.com" />'
+        )
+        tokens = wb_client._extract_form_tokens(html)
+        assert tokens == {'__VIEWSTATE': 'a&b', 'ctl00$Field': 'x>y'}
+
+    def test_ignores_inputs_in_scripts_and_comments(self, wb_client):
+        """Should not let markup in scripts or comments override real tokens."""
+        html = (
+            '<input type="hidden" name="__VIEWSTATE" value="real" />'
+            '<script>var row = \'<input type="hidden" name="__VIEWSTATE" value="fake">\';</script>'
+            '<!-- <input type="hidden" name="__EVENTVALIDATION" value="old"> -->'
+        )
+        tokens = wb_client._extract_form_tokens(html)
+        assert tokens == {'__VIEWSTATE': 'real'}
+
+    def test_returns_empty_dict_for_empty_html(self, wb_client):
         """Should return empty dict for empty HTML."""
-        client = WodBusterClient('https://test.wodbuster.com')
-        tokens = client._extract_form_tokens('')
+        tokens = wb_client._extract_form_tokens('')
         assert tokens == {}
 
 
 class TestLoginErrorDetection:
     """Tests for login error detection."""
 
-    def test_detects_spanish_error(self):
+    def test_detects_spanish_error(self, wb_client):
         """Should detect Spanish error message."""
-        client = WodBusterClient('https://test.wodbuster.com')
         html = '<div class="error">Usuario o contraseña incorrectos</div>'
-        assert client._has_login_error(html) is True
+        assert wb_client._has_login_error(html) is True
 
-    def test_detects_english_error(self):
+    def test_detects_english_error(self, wb_client):
         """Should detect English error message."""
-        client = WodBusterClient('https://test.wodbuster.com')
         html = '<div class="error">Invalid credentials</div>'
-        assert client._has_login_error(html) is True
+        assert wb_client._has_login_error(html) is True
 
-    def test_no_error_in_clean_html(self):
+    def test_no_error_in_clean_html(self, wb_client):
         """Should return False for HTML without errors."""
-        client = WodBusterClient('https://test.wodbuster.com')
         html = '<div>Welcome to WodBuster</div>'
-        assert client._has_login_error(html) is False
+        assert wb_client._has_login_error(html) is False
 
 
 class TestDeviceConfirmation:
     """Tests for device confirmation detection."""
 
-    def test_detects_device_confirmation_spanish(self):
+    def test_detects_device_confirmation_spanish(self, wb_client):
         """Should detect device confirmation in Spanish."""
-        client = WodBusterClient('https://test.wodbuster.com')
         html = '<button>Recordar este dispositivo</button>'
-        assert client._needs_device_confirmation(html) is True
+        assert wb_client._needs_device_confirmation(html) is True
 
-    def test_detects_secure_device_button(self):
+    def test_detects_secure_device_button(self, wb_client):
         """Should detect CtlSeguro button."""
-        client = WodBusterClient('https://test.wodbuster.com')
         html = '<input id="CtlSeguro" type="submit" />'
-        assert client._needs_device_confirmation(html) is True
+        assert wb_client._needs_device_confirmation(html) is True
 
-    def test_no_confirmation_needed(self):
+    def test_no_confirmation_needed(self, wb_client):
         """Should return False when no confirmation needed."""
-        client = WodBusterClient('https://test.wodbuster.com')
         html = '<div>Dashboard</div>'
-        assert client._needs_device_confirmation(html) is False
+        assert wb_client._needs_device_confirmation(html) is False
 
 
 class TestClassParsing:
     """Tests for class data parsing."""
 
     @patch.object(WodBusterClient, '_create_session')
-    def test_parses_classes_from_new_format(self, mock_create, sample_classes_response):
+    def test_parses_classes_from_new_format(self, mock_create, mock_session_factory, sample_classes_response):
         """Should parse classes from new API format."""
-        import json
-        mock_session = MagicMock()
-        mock_response = Mock()
-        mock_response.json.return_value = sample_classes_response
-        mock_response.text = json.dumps(sample_classes_response)
-        mock_response.raise_for_status = Mock()
-        mock_session.get.return_value = mock_response
-        mock_create.return_value = mock_session
+        mock_create.return_value = mock_session_factory(sample_classes_response)
 
         client = WodBusterClient('https://test.wodbuster.com')
         client._logged_in = True
 
-        classes = client.get_classes(datetime(2024, 12, 15))
+        classes = client.get_classes(_FIXED_DAY)
 
         assert len(classes) == 2
         assert classes[0]['name'] == 'CrossFit'
@@ -128,60 +144,212 @@ class TestClassParsing:
         assert classes[1]['name'] == 'Hyrox'
 
     @patch.object(WodBusterClient, '_create_session')
-    def test_find_class_by_time_and_type(self, mock_create, sample_classes_response):
-        """Should find class by time and type."""
-        import json
+    def test_parses_classes_from_body_with_bom(self, mock_create, sample_classes_response):
+        """Should parse a JSON body that starts with a UTF-8 BOM."""
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'\xef\xbb\xbf' + json.dumps(sample_classes_response).encode()
         mock_session = MagicMock()
-        mock_response = Mock()
-        mock_response.json.return_value = sample_classes_response
-        mock_response.text = json.dumps(sample_classes_response)
-        mock_response.raise_for_status = Mock()
-        mock_session.get.return_value = mock_response
+        mock_session.get.return_value = response
         mock_create.return_value = mock_session
 
         client = WodBusterClient('https://test.wodbuster.com')
         client._logged_in = True
 
-        cls = client.find_class(datetime(2024, 12, 15), '07:00', 'crossfit')
+        classes = client.get_classes(_FIXED_DAY)
+
+        assert [cls['name'] for cls in classes] == ['CrossFit', 'Hyrox']
+
+    @patch.object(WodBusterClient, '_create_session')
+    def test_find_class_by_time_and_type(self, mock_create, mock_session_factory, sample_classes_response):
+        """Should find class by time and type."""
+        mock_create.return_value = mock_session_factory(sample_classes_response)
+
+        client = WodBusterClient('https://test.wodbuster.com')
+        client._logged_in = True
+
+        cls = client.find_class(_FIXED_DAY, '07:00', 'crossfit')
 
         assert cls is not None
         assert cls['id'] == 123
         assert cls['name'] == 'CrossFit'
 
     @patch.object(WodBusterClient, '_create_session')
-    def test_find_class_returns_none_when_not_found(self, mock_create, sample_classes_response):
+    def test_find_class_returns_none_when_not_found(self, mock_create, mock_session_factory, sample_classes_response):
         """Should return None when class not found."""
-        import json
-        mock_session = MagicMock()
-        mock_response = Mock()
-        mock_response.json.return_value = sample_classes_response
-        mock_response.text = json.dumps(sample_classes_response)
-        mock_response.raise_for_status = Mock()
-        mock_session.get.return_value = mock_response
+        mock_create.return_value = mock_session_factory(sample_classes_response)
+
+        client = WodBusterClient('https://test.wodbuster.com')
+        client._logged_in = True
+
+        cls = client.find_class(_FIXED_DAY, '09:00', 'yoga')
+
+        assert cls is None
+
+    @patch.object(WodBusterClient, '_create_session')
+    def test_find_class_reuses_fetched_day(self, mock_create, mock_session_factory, sample_classes_response):
+        """Should fetch each day's classes once for repeated lookups."""
+        mock_session = mock_session_factory(sample_classes_response)
         mock_create.return_value = mock_session
 
         client = WodBusterClient('https://test.wodbuster.com')
         client._logged_in = True
 
-        cls = client.find_class(datetime(2024, 12, 15), '09:00', 'yoga')
+        crossfit = client.find_class(_FIXED_DAY, '07:00', 'crossfit')
+        hyrox = client.find_class(_FIXED_DAY, '08:00', 'hyrox')
+
+        assert crossfit['id'] == 123
+        assert hyrox['id'] == 124
+        assert mock_session.get.call_count == 1
+
+    @patch.object(WodBusterClient, '_create_session')
+    def test_find_class_requires_login_for_fetched_day(self, mock_create, mock_session_factory, sample_classes_response):
+        """Should not serve an indexed day once the session is logged out."""
+        mock_create.return_value = mock_session_factory(sample_classes_response)
+
+        client = WodBusterClient('https://test.wodbuster.com')
+        client._logged_in = True
+        client.find_class(_FIXED_DAY, '07:00', 'crossfit')
+        client._logged_in = False
+
+        with pytest.raises(SessionExpiredError):
+            client.find_class(_FIXED_DAY, '07:00', 'crossfit')
+
+    @patch.object(WodBusterClient, '_create_session')
+    def test_find_class_refetches_day_on_miss(self, mock_create, mock_session_factory, sample_classes_response):
+        """Should refetch the day when a lookup misses the fetched classes."""
+        mock_session = mock_session_factory(sample_classes_response)
+        mock_create.return_value = mock_session
+
+        client = WodBusterClient('https://test.wodbuster.com')
+        client._logged_in = True
+
+        client.find_class(_FIXED_DAY, '07:00', 'crossfit')
+        cls = client.find_class(_FIXED_DAY, '09:00', 'yoga')
 
         assert cls is None
+        assert mock_session.get.call_count == 2
+
+    @pytest.fixture
+    def dated_payload(self, sample_classes_response):
+        """Classes payload whose Title is the requested day's date."""
+        def payload(params):
+            title = datetime.fromtimestamp(params['ticks'], timezone.utc).date().isoformat()
+            return dict(sample_classes_response, Title=title)
+
+        return payload
+
+    @patch.object(WodBusterClient, '_create_session')
+    def test_get_classes_range_fetches_each_day(self, mock_create, mock_session_factory, dated_payload):
+        """Should fetch every requested day and key the classes by date."""
+        days = [_FIXED_DAY + timedelta(days=i) for i in range(3)]
+        mock_session = mock_session_factory(dated_payload)
+        mock_create.return_value = mock_session
+
+        client = WodBusterClient('https://test.wodbuster.com')
+        client._logged_in = True
+
+        result = client.get_classes_range(days)
+
+        assert list(result) == days
+        assert [classes[0]['date'] for classes in result.values()] == [
+            '2024-12-15', '2024-12-16', '2024-12-17'
+        ]
+        assert mock_session.get.call_count == 3
+
+    @patch.object(WodBusterClient, '_create_session')
+    def test_get_classes_range_skips_failed_day(self, mock_create, mock_session_factory, dated_payload):
+        """Should leave out a day whose request fails and keep the others in order."""
+        days = [_FIXED_DAY + timedelta(days=i) for i in range(3)]
+        failed_epoch = int(datetime(2024, 12, 16, tzinfo=timezone.utc).timestamp())
+
+        def payload(params):
+            if params['ticks'] == failed_epoch:
+                raise requests.RequestException('Connection reset')
+            return dated_payload(params)
+
+        mock_session = mock_session_factory(payload)
+        mock_create.return_value = mock_session
+
+        client = WodBusterClient('https://test.wodbuster.com')
+        client._logged_in = True
+
+        result = client.get_classes_range(days)
+
+        assert list(result) == [days[0], days[2]]
+        assert [classes[0]['date'] for classes in result.values()] == ['2024-12-15', '2024-12-17']
+        assert mock_session.get.call_count == 3
+
+
+class _FixedDatetime(datetime):
+    """datetime whose now() is _FIXED_DAY."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return _FIXED_DAY
+
+
+class TestReservations:
+    """Tests for listing the user's reservations."""
+
+    @patch('app.scraper.client.datetime', _FixedDatetime)
+    @patch.object(WodBusterClient, '_create_session')
+    def test_get_my_reservations_lists_cancellable_bookings(self, mock_create, mock_session_factory):
+        """Should build a Reservation for each booked, cancellable class."""
+        today_epoch = int(datetime(2024, 12, 15, tzinfo=timezone.utc).timestamp())
+
+        def slot(class_id, name, status, atletas):
+            return {
+                'Hora': '07:00',
+                'Valores': [{
+                    'TipoEstado': status,
+                    'Valor': {
+                        'Id': class_id,
+                        'Nombre': name,
+                        'HoraComienzo': '07:00',
+                        'Plazas': 20,
+                        'AtletasEntrenando': atletas,
+                    },
+                }],
+            }
+
+        def payload(params):
+            day = (params['ticks'] - today_epoch) // 86400
+            if day == 1:
+                data = [slot(201, 'CrossFit', 'Borrable', [{'Id': 9001}])]
+            else:
+                data = [slot(200 + day, 'Hyrox', 'Inscribible', [])]
+            return {'Data': data, 'Title': f'day {day}'}
+
+        mock_session = mock_session_factory(payload)
+        mock_create.return_value = mock_session
+
+        client = WodBusterClient('https://test.wodbuster.com')
+        client._logged_in = True
+
+        reservations = client.get_my_reservations(days_ahead=3)
+
+        assert reservations == [Reservation(
+            id=201,
+            name='CrossFit',
+            time='07:00',
+            date='day 1',
+            date_str='2024-12-16',
+            day_name='Monday',
+            status='Borrable',
+            booking_id=9001,
+            can_cancel=True,
+        )]
+        assert mock_session.get.call_count == 3
 
 
 class TestBooking:
     """Tests for booking functionality."""
 
     @patch.object(WodBusterClient, '_create_session')
-    def test_book_class_success(self, mock_create, sample_booking_success):
+    def test_book_class_success(self, mock_create, mock_session_factory, sample_booking_success):
         """Should return True on successful booking."""
-        import json
-        mock_session = MagicMock()
-        mock_response = Mock()
-        mock_response.json.return_value = sample_booking_success
-        mock_response.text = json.dumps(sample_booking_success)
-        mock_response.raise_for_status = Mock()
-        mock_session.get.return_value = mock_response
-        mock_create.return_value = mock_session
+        mock_create.return_value = mock_session_factory(sample_booking_success)
 
         client = WodBusterClient('https://test.wodbuster.com')
         client._logged_in = True
@@ -191,16 +359,9 @@ class TestBooking:
         assert result is True
 
     @patch.object(WodBusterClient, '_create_session')
-    def test_book_class_raises_class_full(self, mock_create, sample_booking_full):
+    def test_book_class_raises_class_full(self, mock_create, mock_session_factory, sample_booking_full):
         """Should raise ClassFullError when class is full."""
-        import json
-        mock_session = MagicMock()
-        mock_response = Mock()
-        mock_response.json.return_value = sample_booking_full
-        mock_response.text = json.dumps(sample_booking_full)
-        mock_response.raise_for_status = Mock()
-        mock_session.get.return_value = mock_response
-        mock_create.return_value = mock_session
+        mock_create.return_value = mock_session_factory(sample_booking_full)
 
         client = WodBusterClient('https://test.wodbuster.com')
         client._logged_in = True
@@ -209,6 +370,160 @@ class TestBooking:
             client.book_class(123)
 
 
+class TestBookingOpenTime:
+    """Tests for booking open time detection."""
+
+    @patch.object(WodBusterClient, '_create_session')
+    def test_binary_searches_first_unpublished_day(self, mock_create):
+        """Should find the first unpublished day without probing every day."""
+        today = datetime.now()
+        today_epoch = int(datetime.combine(today.date(), datetime.min.time(), tzinfo=timezone.utc).timestamp())
+
+        def get(url, params, timeout):
+            # Days 1-4 are published, days 5+ open in the future
+            day = (params['ticks'] - today_epoch) // 86400
+            payload = {'SegundosHastaPublicacion': 3600} if day >= 5 else {}
+            return SimpleNamespace(content=json.dumps(payload).encode(), raise_for_status=lambda: None)
+
+        mock_session = MagicMock()
+        mock_session.get.side_effect = get
+        mock_create.return_value = mock_session
+
+        client = WodBusterClient('https://test.wodbuster.com')
+        client._logged_in = True
+
+        result = client.get_booking_open_time(days_ahead=7)
+
+        assert result is not None
+        assert result['seconds_until'] == 3600
+        assert result['target_date'] == (today + timedelta(days=5)).date().isoformat()
+        assert mock_session.get.call_count == 3
+
+
+def _account_page(panel, before=''):
+    """Athlete page with the CtlInfoUser panel in its sidebar."""
+    return (
+        '<html><head><title>WodBuster - Schedule</title></head><body>'
+        f'{before}<div id="body_CtlMenu_CtlInfoUser" class="info">{panel}</div>'
+        '<div class="schedule"><div>Lunes</div></div></body></html>'
+    )
+
+
+class TestAccountInfo:
+    """Tests for account info extraction."""
+
+    @pytest.fixture
+    def account_client(self):
+        """Build a logged-in client whose athlete page is the given HTML."""
+        def make(page, content_type='text/html; charset=utf-8', encoding='utf-8'):
+            response = requests.Response()
+            response.status_code = 200
+            response._content = page.encode(encoding)
+            response.headers = CaseInsensitiveDict({'Content-Type': content_type})
+            # As the adapter does when building the response
+            response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+            with patch.object(WodBusterClient, '_create_session') as mock_create:
+                mock_create.return_value.get.return_value = response
+                client = WodBusterClient('https://test.wodbuster.com')
+            client._logged_in = True
+            return client
+
+        return make
+
+    @pytest.fixture
+    def soup_parse(self):
+        """Spy on the BeautifulSoup fallback."""
+        with patch.object(
+            WodBusterClient, '_parse_account_info_soup', autospec=True,
+            side_effect=WodBusterClient._parse_account_info_soup,
+        ) as spy:
+            yield spy
+
+    def test_reads_panel_without_parsing_page(self, account_client, soup_parse):
+        """Should read name, bono and tarifa from the info panel text."""
+        client = account_client(_account_page('Ana Ruiz<br/>\nBono: 5<br/>\nTarifa: Ilimitado\n'))
+
+        info = client.get_account_info()
+
+        assert info == {
+            'available_classes': 5,
+            'subscription': 'Ilimitado',
+            'user_name': 'Ana Ruiz',
+            'has_credits': True,
+        }
+        soup_parse.assert_not_called()
+
+    def test_skips_tags_between_label_and_value(self, account_client, soup_parse):
+        """Should read values wrapped in inline tags."""
+        client = account_client(_account_page('Ana Ruiz\n<span>Bono: <b>0</b></span>\n<span>Tarifa: <b>Bono 10</b></span>'))
+
+        info = client.get_account_info()
+
+        assert info['available_classes'] == 0
+        assert info['subscription'] == 'Bono 10'
+        assert info['has_credits'] is False
+        soup_parse.assert_not_called()
+
+    def test_unescapes_entities(self, account_client):
+        """Should resolve character entities in panel text."""
+        client = account_client(_account_page('Jos&eacute; Garc&iacute;a\nBono: 3\nTarifa: Ma&ntilde;ana &amp; tarde'))
+
+        info = client.get_account_info()
+
+        assert info['user_name'] == 'José García'
+        assert info['subscription'] == 'Mañana & tarde'
+
+    def test_decodes_declared_encoding(self, account_client):
+        """Should decode the panel with the charset the header declares."""
+        page = _account_page('José\nBono: 3\nTarifa: Mañana')
+        client = account_client(page, content_type='text/html; charset=ISO-8859-1', encoding='iso-8859-1')
+
+        info = client.get_account_info()
+
+        assert info['user_name'] == 'José'
+        assert info['subscription'] == 'Mañana'
+
+    def test_ignores_bono_outside_panel(self, account_client):
+        """Should take Bono from the panel even if the page mentions it earlier."""
+        page = _account_page('Ana Ruiz\nBono: 5\n', before='<script>var t = "Bono: 99";</script>')
+        client = account_client(page)
+
+        info = client.get_account_info()
+
+        assert info['available_classes'] == 5
+        assert client._parse_account_info_soup(page.encode())[0] == 5
+
+    def test_reads_tarifa_only_panel(self, account_client, soup_parse):
+        """Should take a panel with a Tarifa but no Bono without parsing the page."""
+        client = account_client(_account_page('Ana Ruiz\nTarifa: Libre'))
+
+        info = client.get_account_info()
+
+        assert info == {
+            'available_classes': None,
+            'subscription': 'Libre',
+            'user_name': 'Ana Ruiz',
+            'has_credits': True,
+        }
+        soup_parse.assert_not_called()
+
+    def test_falls_back_to_soup_without_panel(self, account_client, soup_parse):
+        """Should parse the page when it has no info panel."""
+        page = (
+            '<html><head><title>WodBuster - Schedule</title></head><body>'
+            '<div class="credits"><p>Bono: 7</p></div>'
+            '<div class="schedule"><div>Lunes</div></div></body></html>'
+        )
+        client = account_client(page)
+
+        info = client.get_account_info()
+
+        assert info['available_classes'] == 7
+        assert info['subscription'] is None
+        assert info['user_name'] is None
+        soup_parse.assert_called_once()
+
+
 class TestSessionManagement:
     """Tests for session management."""
 